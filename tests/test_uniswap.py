@@ -71,7 +71,7 @@ def test_assets(client: Uniswap):
     """
     tokens = get_tokens(client.netname)
 
-
+    txids = []
     for token_name, amount in [
         ("DAI", 10_000 * ONE_DAI),
         ("USDC", 10_000 * ONE_USDC),
@@ -81,7 +81,10 @@ def test_assets(client: Uniswap):
         logger.info(f"Cost of {amount} {token_name}: {price}")
         logger.info("Buying...")
 
-        txid = client.make_trade_output(tokens["ETH"], token_addr, amount, fee=FeeTier.TIER_3000)
+        txids.append(client.make_trade_output(tokens["ETH"], token_addr, amount, fee=FeeTier.TIER_3000))
+
+    # Both trades are sent before waiting, so they don't wait on each other
+    for txid in txids:
         tx = client.w3.eth.wait_for_transaction_receipt(txid, timeout=RECEIPT_TIMEOUT)
         assert tx["status"] == 1, f"Transaction failed: {tx}"
 
@@ -201,6 +204,38 @@ class TestUniswap(object):
         r = client.get_price_output(token0, token1, qty, fee=FeeTier.TIER_3000)
         assert r
 
+    def test_get_prices_input(self, client: Uniswap, tokens):
+        tokens1 = [tokens["UNI"], tokens["DAI"]]
+        r = client.get_prices_input(
+            tokens["ETH"], tokens1, ONE_ETH, fee=FeeTier.TIER_3000
+        )
+        assert r == [
+            client.get_price_input(tokens["ETH"], t, ONE_ETH, fee=FeeTier.TIER_3000)
+            for t in tokens1
+        ]
+
+    def test_get_amounts_out_batch(self, client: Uniswap, tokens):
+        if client.version != 2:
+            pytest.skip("Tested method not supported in this Uniswap version")
+        weth = client.get_weth_address()
+        r = client.get_amounts_out_batch(
+            [[weth, tokens["DAI"]], [weth, tokens["DAI"], weth], [weth, weth]],
+            ONE_ETH,
+        )
+        assert r[0] == client.get_price_input(weth, tokens["DAI"], ONE_ETH)
+        assert r[1]
+        assert r[2] is None
+
+    def test_get_prices_output(self, client: Uniswap, tokens):
+        tokens1 = [tokens["UNI"], tokens["DAI"]]
+        r = client.get_prices_output(
+            tokens["ETH"], tokens1, ONE_ETH, fee=FeeTier.TIER_3000
+        )
+        assert r == [
+            client.get_price_output(tokens["ETH"], t, ONE_ETH, fee=FeeTier.TIER_3000)
+            for t in tokens1
+        ]
+
     @pytest.mark.parametrize("token0, token1, fee", [("DAI", "USDC", FeeTier.TIER_3000)])
     def test_get_raw_price(self, client: Uniswap, tokens, token0, token1, fee):
         token0, token1 = tokens[token0], tokens[token1]
@@ -0,0 +1,110 @@
+from typing import Any, List
+from unittest import mock
+
+import pytest
+from hexbytes import HexBytes
+from web3 import Web3
+
+from uniswap import Uniswap
+from uniswap.constants import (
+    APPROVAL_POLL_ATTEMPTS,
+    MAX_APPROVAL_CHECK_INT,
+    MAX_APPROVAL_INT,
+)
+
+TOKEN0 = Web3.to_checksum_address("0x6B175474E89094C44Da98b954EedeAC495271d0F")
+TOKEN1 = Web3.to_checksum_address("0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48")
+ROUTER = Web3.to_checksum_address("0x7a250d5630B4cF539739dF2C5dAcb4c659F2488D")
+
+
+def _uniswap(receipt_status: int = 1) -> Uniswap:
+    # Skips __init__, which needs a node
+    uni = Uniswap.__new__(Uniswap)
+    uni.version = 2
+    uni.router_address = ROUTER
+    uni.max_approval_int = MAX_APPROVAL_INT
+    uni.max_approval_check_int = MAX_APPROVAL_CHECK_INT
+    uni._approved = set()
+    uni.w3 = mock.Mock(
+        **{"eth.wait_for_transaction_receipt.return_value": {"status": receipt_status}}
+    )
+    return uni
+
+
+@pytest.fixture(autouse=True)
+def no_sleep() -> Any:
+    with mock.patch("uniswap.uniswap.time.sleep"):
+        yield
+
+
+def test_approve_many_sends_all_before_waiting() -> None:
+    uni = _uniswap()
+    events: List[str] = []
+
+    def send(*args: Any) -> HexBytes:
+        events.append("send")
+        return HexBytes(b"\x01")
+
+    def wait(*args: Any, **kwargs: Any) -> Any:
+        events.append("wait")
+        return {"status": 1}
+
+    with mock.patch.object(
+        uni.w3.eth, "wait_for_transaction_receipt", side_effect=wait
+    ), mock.patch.object(
+        uni, "_build_and_send_tx", side_effect=send
+    ), mock.patch.object(
+        uni, "_get_allowance", return_value=MAX_APPROVAL_INT
+    ):
+        uni.approve_many([TOKEN0, TOKEN1])
+    assert events == ["send", "send", "wait", "wait"]
+    assert uni._is_approved(TOKEN0) and uni._is_approved(TOKEN1)
+
+
+def test_approve_raises_on_failed_receipt() -> None:
+    uni = _uniswap(receipt_status=0)
+    with mock.patch.object(
+        uni, "_build_and_send_tx", return_value=HexBytes(b"\x01")
+    ), mock.patch.object(uni, "_get_allowance", return_value=0):
+        with pytest.raises(Exception, match="failed"):
+            uni.approve(TOKEN0)
+    assert uni._approved == set()
+
+
+def test_approve_stops_polling_at_threshold() -> None:
+    uni = _uniswap()
+    with mock.patch.object(
+        uni, "_build_and_send_tx", return_value=HexBytes(b"\x01")
+    ), mock.patch.object(
+        uni, "_get_allowance", return_value=MAX_APPROVAL_CHECK_INT
+    ) as get_allowance:
+        uni.approve(TOKEN0)
+    assert get_allowance.call_count == 1
+    assert uni._is_approved(TOKEN0)
+
+
+def test_approve_caches_only_observed_allowance() -> None:
+    uni = _uniswap()
+    # e.g. a token capping allowances to uint96
+    capped = 2**96 - 1
+    with mock.patch.object(
+        uni, "_build_and_send_tx", return_value=HexBytes(b"\x01")
+    ), mock.patch.object(uni, "_get_allowance", return_value=capped) as get_allowance:
+        uni.approve(TOKEN0)
+        assert get_allowance.call_count == APPROVAL_POLL_ATTEMPTS
+        assert not uni._is_approved(TOKEN0)
+
+
+def test_invalidate_approval() -> None:
+    uni = _uniswap()
+    with mock.patch.object(
+        uni, "_get_allowance", return_value=MAX_APPROVAL_INT
+    ) as get_allowance:
+        assert uni._is_approved(TOKEN0)
+        # Known to be approved, so the allowance isn't fetched again
+        assert uni._is_approved(TOKEN0)
+        assert get_allowance.call_count == 1
+
+        uni.invalidate_approval(TOKEN0)
+        assert uni._is_approved(TOKEN0)
+        assert get_allowance.call_count == 2
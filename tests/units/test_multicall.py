@@ -0,0 +1,54 @@
+from typing import Any, Callable, Dict
+from unittest import mock
+
+from web3 import Web3
+from web3.exceptions import ContractLogicError
+
+from uniswap import Uniswap
+from uniswap.exceptions import InvalidToken
+
+TOKEN = Web3.to_checksum_address("0x6B175474E89094C44Da98b954EedeAC495271d0F")
+
+
+def _uniswap_without_multicall2(eth_call: Callable[..., bytes]) -> Uniswap:
+    # Skips __init__, which needs a node
+    uni = Uniswap.__new__(Uniswap)
+    uni.multicall2 = None
+    uni.w3 = mock.Mock(**{"eth.call.side_effect": eth_call})
+    return uni
+
+
+def test_multicall_try_raw_falls_back_to_single_calls() -> None:
+    def call(tx: Dict[str, Any], block_identifier: str) -> bytes:
+        if tx["data"] == b"\x02":
+            raise ContractLogicError("execution reverted")
+        return b"\x00" + tx["data"]
+
+    uni = _uniswap_without_multicall2(call)
+    assert uni._multicall_try_raw([(TOKEN, b"\x01"), (TOKEN, b"\x02")]) == [
+        (True, b"\x00\x01"),
+        (False, b""),
+    ]
+    assert uni._multicall_raw([(TOKEN, b"\x01")]) == [b"\x00\x01"]
+
+
+def test_get_tokens_skips_invalid_tokens() -> None:
+    uni = Uniswap.__new__(Uniswap)
+    uni.w3 = Web3()
+    uni._token_cache = {}
+    bad_token = Web3.to_checksum_address("0x" + "11" * 20)
+    encode = uni.w3.codec.encode
+    results = [
+        (True, encode(["string"], ["Dai Stablecoin"])),
+        (True, encode(["string"], ["DAI"])),
+        (True, encode(["uint8"], [18])),
+        # e.g. a contract without name()
+        (False, b""),
+        (True, encode(["string"], ["BAD"])),
+        (True, encode(["uint8"], [18])),
+    ]
+    with mock.patch.object(
+        uni, "_multicall_try_raw", return_value=results
+    ), mock.patch.object(uni, "get_token", side_effect=InvalidToken(bad_token)):
+        tokens = uni._get_tokens([TOKEN, bad_token])
+    assert [token.symbol for token in tokens] == ["DAI"]
@@ -0,0 +1,161 @@
+import threading
+from typing import Any, List
+from unittest import mock
+
+import pytest
+from hexbytes import HexBytes
+from web3.types import Nonce, TxParams
+
+from uniswap import Uniswap
+from uniswap.constants import NONCE_RESYNC_INTERVAL
+from uniswap.util import _str_to_addr
+
+ADDRESS = _str_to_addr("0x94e3361495bD110114ac0b6e35Ed75E77E6a6cFA")
+
+
+class Node:
+    """Stands in for the node, with a settable pending transaction count."""
+
+    def __init__(self, tx_count: int) -> None:
+        self.tx_count = tx_count
+        self.fetches = 0
+        self.used_nonces: List[int] = []
+        self.fetch_error: Any = None
+        self.send_error: Any = None
+
+    def get_transaction_count(self, address: Any, block_identifier: str) -> int:
+        assert block_identifier == "pending"
+        if self.fetch_error:
+            raise self.fetch_error
+        self.fetches += 1
+        return self.tx_count
+
+    def send_raw_transaction(self, raw_transaction: Any) -> HexBytes:
+        if self.send_error:
+            raise self.send_error
+        return HexBytes(b"\x01")
+
+
+def _uniswap(node: Node, exclusive_wallet: bool = False) -> Uniswap:
+    # Skips __init__, which needs a node
+    uni = Uniswap.__new__(Uniswap)
+    uni.address = ADDRESS
+    uni.private_key = "0x" + "00" * 32
+    uni.use_estimate_gas = False
+    uni.last_nonce = Nonce(0)
+    uni._nonce_synced_at = 0.0
+    uni.exclusive_wallet = exclusive_wallet
+    uni._nonce_lock = threading.RLock()
+    uni.w3 = mock.Mock(
+        **{
+            "eth.get_transaction_count.side_effect": node.get_transaction_count,
+            "eth.send_raw_transaction.side_effect": node.send_raw_transaction,
+        }
+    )
+    return uni
+
+
+def _send(uni: Uniswap, node: Node) -> None:
+    def build_transaction(tx_params: TxParams) -> TxParams:
+        node.used_nonces.append(tx_params["nonce"])
+        return tx_params
+
+    function = mock.Mock(**{"build_transaction.side_effect": build_transaction})
+    uni._build_and_send_tx(function, {"from": "0x" + "00" * 20})
+
+
+@pytest.fixture
+def clock() -> Any:
+    with mock.patch("uniswap.uniswap.time.time", return_value=1000.0) as time:
+        yield time
+
+
+def test_nonce_is_tracked_locally(clock: Any) -> None:
+    node = Node(tx_count=5)
+    uni = _uniswap(node)
+    for _ in range(3):
+        _send(uni, node)
+    assert node.used_nonces == [5, 6, 7]
+    assert node.fetches == 1
+
+
+def test_nonce_resyncs_periodically(clock: Any) -> None:
+    node = Node(tx_count=5)
+    uni = _uniswap(node)
+    _send(uni, node)
+
+    # A node lagging behind doesn't make us reuse a nonce
+    node.tx_count = 3
+    clock.return_value += NONCE_RESYNC_INTERVAL + 1
+    _send(uni, node)
+    # Transactions sent from elsewhere are picked up
+    node.tx_count = 10
+    clock.return_value += NONCE_RESYNC_INTERVAL + 1
+    _send(uni, node)
+    assert node.used_nonces == [5, 6, 10]
+    assert node.fetches == 3
+
+
+def test_nonce_resyncs_after_failed_send(clock: Any) -> None:
+    node = Node(tx_count=5)
+    uni = _uniswap(node)
+    for _ in range(3):
+        _send(uni, node)
+
+    node.tx_count = 20
+    node.send_error = ValueError("nonce too low")
+    with pytest.raises(ValueError, match="nonce too low"):
+        _send(uni, node)
+    node.send_error = None
+    _send(uni, node)
+    assert node.used_nonces == [5, 6, 7, 8, 20]
+
+
+def test_failed_resync_keeps_send_error(clock: Any) -> None:
+    node = Node(tx_count=5)
+    uni = _uniswap(node)
+    _send(uni, node)
+
+    node.send_error = ValueError("nonce too low")
+    node.fetch_error = ConnectionError()
+    with pytest.raises(ValueError, match="nonce too low"):
+        _send(uni, node)
+
+    # The nonce is refetched before the next transaction instead
+    node.send_error = None
+    node.tx_count = 20
+    node.fetch_error = None
+    _send(uni, node)
+    assert node.used_nonces == [5, 6, 20]
+
+
+def test_mark_nonce_stale(clock: Any) -> None:
+    node = Node(tx_count=5)
+    uni = _uniswap(node)
+    _send(uni, node)
+
+    # e.g. after a transaction sent with transact()
+    node.tx_count = 7
+    uni._mark_nonce_stale()
+    _send(uni, node)
+    assert node.used_nonces == [5, 7]
+
+
+def test_exclusive_wallet_only_syncs_once(clock: Any) -> None:
+    node = Node(tx_count=5)
+    uni = _uniswap(node, exclusive_wallet=True)
+    _send(uni, node)
+    clock.return_value += 100 * NONCE_RESYNC_INTERVAL
+    _send(uni, node)
+    assert node.used_nonces == [5, 6]
+    assert node.fetches == 1
+
+    # ...except after a failed send
+    node.tx_count = 20
+    node.send_error = ValueError("nonce too low")
+    with pytest.raises(ValueError):
+        _send(uni, node)
+    node.send_error = None
+    _send(uni, node)
+    assert node.used_nonces == [5, 6, 7, 20]
+    assert node.fetches == 2
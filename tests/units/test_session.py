@@ -0,0 +1,20 @@
+from unittest import mock
+
+import pytest
+import requests
+
+from uniswap import Uniswap
+
+PROVIDER = "http://session-test.invalid:8545"
+
+
+def test_ignored_session_warns(caplog: pytest.LogCaptureFixture) -> None:
+    # Net.version is the only RPC made by __init__ for v1
+    with mock.patch(
+        "web3.net.Net.version", new_callable=mock.PropertyMock, return_value="1"
+    ):
+        Uniswap(None, None, provider=PROVIDER, session=requests.Session())
+        assert "session is ignored" not in caplog.text
+        # web3 already cached the first session for this thread and provider
+        Uniswap(None, None, provider=PROVIDER, session=requests.Session())
+        assert "session is ignored" in caplog.text
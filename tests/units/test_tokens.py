@@ -0,0 +1,10 @@
+import pytest
+from web3 import Web3
+
+from uniswap.tokens import get_tokens
+
+
+@pytest.mark.parametrize("netname", ["mainnet", "rinkeby", "arbitrum"])
+def test_token_addresses_are_checksummed(netname: str) -> None:
+    for symbol, address in get_tokens(netname).items():
+        assert Web3.is_checksum_address(address), symbol
@@ -0,0 +1,62 @@
+from typing import Any
+from unittest import mock
+
+import pytest
+from web3 import Web3
+
+from uniswap import Uniswap
+from uniswap.constants import ETH_ADDRESS
+
+DAI = Web3.to_checksum_address("0x6B175474E89094C44Da98b954EedeAC495271d0F")
+USDC = Web3.to_checksum_address("0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48")
+WETH = Web3.to_checksum_address("0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2")
+ADDRESS = Web3.to_checksum_address("0x94e3361495bD110114ac0b6e35Ed75E77E6a6cFA")
+DEADLINE = 1_000_000
+
+
+def _uniswap(version: int) -> Any:
+    # Skips __init__, which needs a node
+    uni = Uniswap.__new__(Uniswap)
+    uni.version = version
+    uni.address = ADDRESS
+    uni.default_slippage = 0.01
+    uni.router = mock.Mock()
+    uni._exchange_contract = mock.Mock()  # type: ignore[method-assign]
+    return uni
+
+
+@pytest.fixture
+def patched() -> Any:
+    with mock.patch.multiple(
+        Uniswap,
+        _is_approved=mock.Mock(return_value=True),
+        get_token_balance=mock.Mock(return_value=10**18),
+        get_weth_address=mock.Mock(return_value=WETH),
+        _deadline=mock.Mock(return_value=DEADLINE),
+        _build_and_send_tx=mock.DEFAULT,
+        _get_balance_and_price=mock.DEFAULT,
+        _get_tx_params=mock.DEFAULT,
+    ) as mocks:
+        yield mocks
+
+
+def test_min_amount_out_skips_quote_v2(patched: Any) -> None:
+    uni = _uniswap(version=2)
+    uni.make_trade(DAI, USDC, 1000, min_amount_out=123)
+
+    patched["_get_balance_and_price"].assert_not_called()
+    uni.router.functions.swapExactTokensForTokens.assert_called_once_with(
+        1000, 123, [DAI, WETH, USDC], ADDRESS, DEADLINE
+    )
+
+
+@pytest.mark.parametrize("min_amount_out, expected", [(None, 1), (123, 123)])
+def test_min_amount_out_v1_token_to_eth(
+    patched: Any, min_amount_out: Any, expected: int
+) -> None:
+    uni = _uniswap(version=1)
+    uni.make_trade(DAI, ETH_ADDRESS, 1000, min_amount_out=min_amount_out)
+
+    patched["_get_balance_and_price"].assert_not_called()
+    functions = uni._exchange_contract.return_value.functions
+    functions.tokenToEthSwapInput.assert_called_once_with(1000, expected, DEADLINE)
@@ -0,0 +1,58 @@
+from typing import cast
+
+import pytest
+from eth_typing import Address
+from web3.exceptions import NameNotFound
+
+from uniswap.types import AddressLike
+from uniswap.util import (
+    _add_slippage,
+    _get_amount_in,
+    _get_amount_out,
+    _sub_slippage,
+    _validate_address,
+)
+
+
+@pytest.mark.parametrize(
+    "amount, slippage, expected",
+    [
+        (1000, 0.01, 1010),
+        (1000, 0, 1000),
+        # Too large to be represented exactly as a float
+        (10**30 + 1, 0.01, 101 * 10**28 + 1),
+    ],
+)
+def test_add_slippage(amount: int, slippage: float, expected: int) -> None:
+    assert _add_slippage(amount, slippage) == expected
+
+
+@pytest.mark.parametrize(
+    "amount, slippage, expected",
+    [
+        (1000, 0.01, 990),
+        (1000, 0, 1000),
+        (10**30 + 100, 0.01, 99 * 10**28 + 99),
+    ],
+)
+def test_sub_slippage(amount: int, slippage: float, expected: int) -> None:
+    assert _sub_slippage(amount, slippage) == expected
+
+
+def test_get_amount_in_inverts_get_amount_out() -> None:
+    reserve_in, reserve_out = 10**21, 5 * 10**24
+    amount_out = _get_amount_out(10**18, reserve_in, reserve_out)
+    amount_in = _get_amount_in(amount_out, reserve_in, reserve_out)
+    # Buying what selling 1 ETH returns mustn't cost more than 1 ETH
+    assert amount_in <= 10**18
+    assert _get_amount_out(amount_in, reserve_in, reserve_out) >= amount_out
+
+
+def test_validate_address() -> None:
+    _validate_address(cast(AddressLike, "0x" + "ab" * 20))
+    _validate_address(Address(bytes(20)))
+    for invalid in ["0x1234", "0x" + "zz" * 20, "ab" * 21]:
+        with pytest.raises(NameNotFound):
+            _validate_address(cast(AddressLike, invalid))
+    with pytest.raises(NameNotFound):
+        _validate_address(Address(bytes(19)))
@@ -8,6 +8,7 @@ SIMPLE_CACHE_RPC_WHITELIST = cast(
     Set[RPCEndpoint],
     {
         "eth_chainId",
+        "net_version",
     },
 )
 
@@ -73,8 +74,37 @@ _router_contract_addresses_v2 = {
     "harmony_testnet": "0x1b02dA8Cb0d097eB8D57A175b88c7D8b47997506",
 }
 
+# Same on all networks, see https://github.com/Uniswap/uniswap-v3-periphery/blob/main/deploys.md
+_factory_contract_address_v3 = "0x1F98431c8aD98523631AE4a59f267346ea31F984"
+_quoter_contract_address_v3 = "0xb27308f9F90D607463bb33eA1BeBb41C27CE5AB6"
+_router_contract_address_v3 = "0xE592427A0AEce92De3Edee1F18E0157C05861564"
+_position_manager_contract_address_v3 = "0xC36442b4a4522E871399CD717aBDD847Ab11FE88"
+
+# Networks with a known Multicall2 deployment, see https://github.com/makerdao/multicall
+# On other networks, batched reads fall back to one eth_call per call.
+_multicall2_addresses = {
+    "mainnet": "0x5BA1e12693Dc8F9c48aAD8770482f4739bEeD696",
+    "ropsten": "0x5BA1e12693Dc8F9c48aAD8770482f4739bEeD696",
+    "rinkeby": "0x5BA1e12693Dc8F9c48aAD8770482f4739bEeD696",
+    "görli": "0x5BA1e12693Dc8F9c48aAD8770482f4739bEeD696",
+    "kovan": "0x5BA1e12693Dc8F9c48aAD8770482f4739bEeD696",
+    "arbitrum": "0x50075F151ABC5B6B448b1272A0a1cFb5CFA25828",
+}
+
 MAX_UINT_128 = (2**128) - 1
 
+# Allowance given to the exchange/router when approving a token
+MAX_APPROVAL_INT = (1 << 256) - 1
+# Allowances above this are considered approved, as the allowance decreases with each trade
+MAX_APPROVAL_CHECK_INT = (1 << 196) - 1
+
+# How often (and how many seconds apart) to check that a mined approval is visible to the provider
+APPROVAL_POLL_ATTEMPTS = 10
+APPROVAL_POLL_INTERVAL = 0.1
+
+# Seconds after which the nonce is refetched from the node, in case it was used elsewhere
+NONCE_RESYNC_INTERVAL = 10
+
 # Source: https://github.com/Uniswap/v3-core/blob/v1.0.0/contracts/libraries/TickMath.sol#L8-L11
 MIN_TICK = -887272
 MAX_TICK = -MIN_TICK
@@ -30,13 +30,9 @@ def check_approval(
     def approved(self: "Uniswap", *args: P.args, **kwargs: P.kwargs) -> T:
         # Check to see if the first token is actually ETH
         token: Optional[AddressLike] = args[0] if args[0] != ETH_ADDRESS else None  # type: ignore
-        token_two = None
 
-        # Check second token, if needed
-        if method.__name__ == "make_trade" or method.__name__ == "make_trade_output":
-            token_two = args[1] if args[1] != ETH_ADDRESS else None
-
-        # Approve both tokens, if needed
+        # Only the token being spent needs approval (for trades that's the input token,
+        # the output token is sent to us and needs none), so there's a single check.
         if token:
             is_approved = self._is_approved(token)
             # logger.warning(f"Approved? {token}: {is_approved}")
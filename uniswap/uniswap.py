@@ -1,24 +1,34 @@
+import asyncio
 import functools
 import logging
 import os
+import threading
 import time
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from typing import (
     Any,
+    Callable,
     Dict,
     Iterable,
     List,
     Optional,
     Sequence,
+    Set,
     Tuple,
+    TypeVar,
     Union,
 )
 
+import requests
+from eth_typing import URI
 from eth_typing.evm import Address, ChecksumAddress
 from hexbytes import HexBytes
+from typing_extensions import ParamSpec
 from web3 import Web3
 from web3._utils.abi import map_abi_data
 from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+from web3._utils.request import cache_and_return_session
 from web3.contract import Contract
 from web3.contract.contract import ContractFunction
 from web3.exceptions import BadFunctionCallOutput, ContractLogicError
@@ -30,14 +40,24 @@ from web3.types import (
 )
 
 from .constants import (
+    APPROVAL_POLL_ATTEMPTS,
+    APPROVAL_POLL_INTERVAL,
     ETH_ADDRESS,
+    MAX_APPROVAL_CHECK_INT,
+    MAX_APPROVAL_INT,
     MAX_TICK,
     MAX_UINT_128,
     MIN_TICK,
+    NONCE_RESYNC_INTERVAL,
     WETH9_ADDRESS,
+    _factory_contract_address_v3,
     _factory_contract_addresses_v1,
     _factory_contract_addresses_v2,
+    _multicall2_addresses,
     _netid_to_name,
+    _position_manager_contract_address_v3,
+    _quoter_contract_address_v3,
+    _router_contract_address_v3,
     _router_contract_addresses_v2,
     _tick_bitmap_range,
     _tick_spacing,
@@ -48,11 +68,15 @@ from .fee import validate_fee_tier
 from .token import ERC20Token
 from .types import AddressLike
 from .util import (
+    _add_slippage,
     _addr_to_str,
+    _get_amount_in,
+    _get_amount_out,
     _get_eth_simple_cache_middleware,
     _load_contract,
     _load_contract_erc20,
     _str_to_addr,
+    _sub_slippage,
     _validate_address,
     chunks,
     encode_sqrt_ratioX96,
@@ -63,6 +87,9 @@ from .util import (
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+P = ParamSpec("P")
+
 
 class Uniswap:
     """
@@ -92,6 +119,8 @@ class Uniswap:
         factory_contract_addr: Optional[str] = None,
         router_contract_addr: Optional[str] = None,
         enable_caching: bool = False,
+        session: Optional[requests.Session] = None,
+        exclusive_wallet: bool = False,
     ) -> None:
         """
         :param address: The public address of the ETH wallet to use.
@@ -103,10 +132,16 @@ class Uniswap:
         :param factory_contract_addr: Can be optionally set to override the address of the factory contract.
         :param router_contract_addr: Can be optionally set to override the address of the router contract (v2 only).
         :param enable_caching: Optionally enables middleware caching RPC method calls.
+        :param session: Can be optionally set to a custom ``requests.Session`` for HTTP requests to the provider. Only used when ``web3`` isn't set.
+            web3 keeps one session per thread and provider URI, so it's only used from the thread creating the instance, and only if no session is cached there for the same URI yet (a warning is logged otherwise).
+        :param exclusive_wallet: Set if the wallet is only used by this instance, so the nonce never has to be refetched from the node (except after a failed transaction).
         """
         self.address = _str_to_addr(
             address or "0x0000000000000000000000000000000000000000"
         )
+        # Static part of every transaction's params, see _get_tx_params
+        self._tx_params_template: TxParams = {"from": _addr_to_str(self.address)}
+
         self.private_key = (
             private_key
             or "0x0000000000000000000000000000000000000000000000000000000000000000"
@@ -128,7 +163,18 @@ class Uniswap:
             # Initialize web3. Extra provider for testing.
             if not provider:
                 provider = os.environ["PROVIDER"]
-            self.w3 = Web3(Web3.HTTPProvider(provider, request_kwargs={"timeout": 60}))
+            http_provider = Web3.HTTPProvider(
+                provider, request_kwargs={"timeout": 60}, session=session
+            )
+            # NOTE: Relies on web3 internals (web3._utils.request, as of web3 v6),
+            # which is where HTTPProvider caches its session per thread and URI.
+            if session is not None and (
+                cache_and_return_session(URI(provider)) is not session
+            ):
+                logger.warning(
+                    "The given session is ignored, as web3 already has a session for this provider in this thread"
+                )
+            self.w3 = Web3(http_provider)
 
         if enable_caching:
             self.w3.middleware_onion.inject(_get_eth_simple_cache_middleware(), layer=0)
@@ -140,17 +186,19 @@ class Uniswap:
             raise Exception(f"Unknown netid: {self.netid}")  # pragma: no cover
         logger.info(f"Using {self.w3} ('{self.netname}', netid: {self.netid})")
 
-        self.last_nonce: Nonce = self.w3.eth.get_transaction_count(self.address)
+        # The nonce is fetched when the first transaction is built, see _get_nonce
+        self.last_nonce: Nonce = Nonce(0)
+        self._nonce_synced_at = 0.0
+        self.exclusive_wallet = exclusive_wallet
+        self._nonce_lock = threading.RLock()
 
         # This code automatically approves you for trading on the exchange.
         # max_approval is to allow the contract to exchange on your behalf.
         # max_approval_check checks that current approval is above a reasonable number
         # The program cannot check for max_approval each time because it decreases
         # with each trade.
-        max_approval_hex = f"0x{64 * 'f'}"
-        self.max_approval_int = int(max_approval_hex, 16)
-        max_approval_check_hex = f"0x{15 * '0'}{49 * 'f'}"
-        self.max_approval_check_int = int(max_approval_check_hex, 16)
+        self.max_approval_int = MAX_APPROVAL_INT
+        self.max_approval_check_int = MAX_APPROVAL_CHECK_INT
 
         if self.version == 1:
             if factory_contract_addr is None:
@@ -180,50 +228,54 @@ class Uniswap:
                 address=self.router_address,
             )
         elif self.version == 3:
-            # https://github.com/Uniswap/uniswap-v3-periphery/blob/main/deploys.md
-            factory_contract_address = _str_to_addr(
-                "0x1F98431c8aD98523631AE4a59f267346ea31F984"
-            )
             self.factory_contract = _load_contract(
-                self.w3, abi_name="uniswap-v3/factory", address=factory_contract_address
-            )
-            quoter_addr = _str_to_addr("0xb27308f9F90D607463bb33eA1BeBb41C27CE5AB6")
-            self.router_address = _str_to_addr(
-                "0xE592427A0AEce92De3Edee1F18E0157C05861564"
+                self.w3,
+                abi_name="uniswap-v3/factory",
+                address=_str_to_addr(_factory_contract_address_v3),
             )
+            self.router_address = _str_to_addr(_router_contract_address_v3)
             self.quoter = _load_contract(
-                self.w3, abi_name="uniswap-v3/quoter", address=quoter_addr
+                self.w3,
+                abi_name="uniswap-v3/quoter",
+                address=_str_to_addr(_quoter_contract_address_v3),
             )
             self.router = _load_contract(
                 self.w3, abi_name="uniswap-v3/router", address=self.router_address
             )
             self.positionManager_addr = _str_to_addr(
-                "0xC36442b4a4522E871399CD717aBDD847Ab11FE88"
+                _position_manager_contract_address_v3
             )
             self.nonFungiblePositionManager = _load_contract(
                 self.w3,
                 abi_name="uniswap-v3/nonFungiblePositionManager",
                 address=self.positionManager_addr,
             )
-            if self.netname == "arbitrum":
-                multicall2_addr = _str_to_addr(
-                    "0x50075F151ABC5B6B448b1272A0a1cFb5CFA25828"
-                )
-            else:
-                multicall2_addr = _str_to_addr(
-                    "0x5BA1e12693Dc8F9c48aAD8770482f4739bEeD696"
-                )
-            self.multicall2 = _load_contract(
-                self.w3, abi_name="uniswap-v3/multicall", address=multicall2_addr
-            )
         else:
             raise Exception(
                 f"Invalid version '{self.version}', only 1, 2 or 3 supported"
             )
 
+        # Multicall2 is used by all versions to batch contract reads into one eth_call,
+        # where it's deployed (see _multicall_raw for the fallback)
+        self.multicall2: Optional[Contract] = None
+        if self.netname in _multicall2_addresses:
+            self.multicall2 = _load_contract(
+                self.w3,
+                abi_name="uniswap-v3/multicall",
+                address=_str_to_addr(_multicall2_addresses[self.netname]),
+            )
+
         if hasattr(self, "factory_contract"):
             logger.info(f"Using factory contract: {self.factory_contract}")
 
+        # Token metadata and v1 exchange addresses never change, so they're only fetched once
+        self._token_cache: Dict[Tuple[Address, str], ERC20Token] = {}
+        self._exchange_address_cache: Dict[Address, AddressLike] = {}
+        self._exchange_contract_cache: Dict[Address, Contract] = {}
+        self._weth_address: Optional[ChecksumAddress] = None
+        # Tokens known to be approved, see _is_approved
+        self._approved: Set[Address] = set()
+
     # ------ Market --------------------------------------------------------------------
 
     def get_price_input(
@@ -262,6 +314,205 @@ class Uniswap:
         else:
             return self._get_token_token_output_price(token0, token1, qty, fee, route)
 
+    def get_prices_input(
+        self,
+        token0: AddressLike,  # input token
+        tokens1: Sequence[AddressLike],  # output tokens
+        qty: int,
+        fee: Optional[int] = None,
+    ) -> List[int]:
+        """
+        Like :meth:`get_price_input`, but quotes `qty` of `token0` against several output tokens in a single multicall.
+
+        If any of the quotes reverts (e.g. because a pool doesn't exist), the whole batch reverts.
+        """
+        return self._get_prices(token0, tokens1, qty, fee, exact_input=True)
+
+    def get_prices_output(
+        self,
+        token0: AddressLike,  # input token
+        tokens1: Sequence[AddressLike],  # output tokens
+        qty: int,
+        fee: Optional[int] = None,
+    ) -> List[int]:
+        """
+        Like :meth:`get_price_output`, but quotes buying `qty` of several output tokens with `token0` in a single multicall.
+
+        If any of the quotes reverts (e.g. because a pool doesn't exist), the whole batch reverts.
+        """
+        return self._get_prices(token0, tokens1, qty, fee, exact_input=False)
+
+    @supports([2])
+    def get_amounts_out_batch(
+        self, routes: Sequence[Sequence[AddressLike]], qty: int
+    ) -> List[Optional[int]]:
+        """
+        Quotes selling `qty` of the first token of each route, returning the amount of the last token received.
+
+        All routes are quoted in a single multicall. Routes that can't be quoted (e.g. because a pair doesn't exist) give None.
+        """
+        results = self._multicall_try_raw(
+            [
+                (
+                    self.router.address,
+                    self.router.functions.getAmountsOut(
+                        qty, list(route)
+                    )._encode_transaction_data(),
+                )
+                for route in routes
+            ]
+        )
+        return [
+            int(self.w3.codec.decode(["uint256[]"], result)[0][-1]) if success else None
+            for success, result in results
+        ]
+
+    def _get_prices(
+        self,
+        token0: AddressLike,
+        tokens1: Sequence[AddressLike],
+        qty: int,
+        fee: Optional[int],
+        exact_input: bool,
+    ) -> List[int]:
+        fee = validate_fee_tier(fee=fee, version=self.version)
+        functions = [
+            self._price_function(token0, token1, qty, fee, exact_input)
+            for token1 in tokens1
+        ]
+        results = self._multicall_raw(
+            [(fn.address, fn._encode_transaction_data()) for fn in functions]
+        )
+        return [self._decode_price(result, exact_input) for result in results]
+
+    def _decode_price(self, result: bytes, exact_input: bool) -> int:
+        """Decode the return data of a call built by :meth:`_price_function`."""
+        if self.version == 2:
+            # getAmountsOut/getAmountsIn return the amounts for every hop of the route
+            (amounts,) = self.w3.codec.decode(["uint256[]"], result)
+            return int(amounts[-1] if exact_input else amounts[0])
+        (price,) = self.w3.codec.decode(["uint256"], result)
+        return int(price)
+
+    def _get_balance_and_price(
+        self,
+        input_token: AddressLike,
+        output_token: AddressLike,
+        qty: int,
+        fee: int,
+        exact_input: bool,
+    ) -> Tuple[int, int]:
+        """
+        Get our balance of the input token and a quote for the trade (see :meth:`_price_function`),
+        fetched together in a single multicall where Multicall2 is available.
+        """
+        price_fn = self._price_function(
+            input_token, output_token, qty, fee, exact_input
+        )
+        if self.multicall2 is None:
+            price = self._decode_price(
+                self._call_raw(price_fn.address, price_fn._encode_transaction_data()),
+                exact_input,
+            )
+            if is_same_address(input_token, ETH_ADDRESS):
+                return self.get_eth_balance(), price
+            return self.get_token_balance(input_token), price
+
+        if is_same_address(input_token, ETH_ADDRESS):
+            balance_fn = self.multicall2.functions.getEthBalance(self.address)
+        else:
+            balance_fn = _load_contract_erc20(self.w3, input_token).functions.balanceOf(
+                self.address
+            )
+        balance_result, price_result = self._multicall_raw(
+            [
+                (fn.address, fn._encode_transaction_data())
+                for fn in (balance_fn, price_fn)
+            ]
+        )
+        (balance,) = self.w3.codec.decode(["uint256"], balance_result)
+        return balance, self._decode_price(price_result, exact_input)
+
+    def _get_balance_and_min_amount_out(
+        self,
+        input_token: AddressLike,
+        output_token: AddressLike,
+        qty: int,
+        fee: int,
+        slippage: float,
+        min_amount_out: Optional[int],
+    ) -> Tuple[int, int]:
+        """
+        Get our balance of the input token and the min. amount of the output token to accept for `qty` of it.
+
+        Unless given, the min. amount is derived from a quote fetched in the same multicall as the balance.
+        On v1 it defaults to `qty` for ETH to token, 1 for token to ETH, and is derived from the
+        exchange reserves and `slippage` for token to token.
+        """
+        if min_amount_out is not None:
+            return self.get_token_balance(input_token), min_amount_out
+        if self.version == 1:
+            if is_same_address(input_token, ETH_ADDRESS):
+                min_amount_out = qty
+            elif is_same_address(output_token, ETH_ADDRESS):
+                min_amount_out = 1
+            else:
+                min_amount_out, _ = self._calculate_max_output_token(
+                    input_token, qty, output_token, slippage
+                )
+            return self.get_token_balance(input_token), min_amount_out
+        balance, price = self._get_balance_and_price(
+            input_token, output_token, qty, fee, exact_input=True
+        )
+        return balance, _sub_slippage(price, slippage)
+
+    def _price_function(
+        self,
+        token0: AddressLike,
+        token1: AddressLike,
+        qty: int,
+        fee: int,
+        exact_input: bool,
+    ) -> ContractFunction:
+        """The contract call that quotes a trade, with the same default routes as the single price getters."""
+        if self.version == 1:
+            if is_same_address(token0, ETH_ADDRESS):
+                ex = self._exchange_contract(token1)
+                if exact_input:
+                    return ex.functions.getEthToTokenInputPrice(qty)
+                return ex.functions.getEthToTokenOutputPrice(qty)
+            elif is_same_address(token1, ETH_ADDRESS):
+                ex = self._exchange_contract(token0)
+                if exact_input:
+                    return ex.functions.getTokenToEthInputPrice(qty)
+                return ex.functions.getTokenToEthOutputPrice(qty)
+            raise ValueError("function not supported for this version of Uniswap")
+
+        weth = self.get_weth_address()
+        if is_same_address(token0, ETH_ADDRESS):
+            token0 = weth
+        if is_same_address(token1, ETH_ADDRESS):
+            token1 = weth
+        if self.version == 2:
+            if is_same_address(token0, weth) or is_same_address(token1, weth):
+                route = [token0, token1]
+            else:
+                route = [token0, weth, token1]
+            if exact_input:
+                return self.router.functions.getAmountsOut(qty, route)
+            return self.router.functions.getAmountsIn(qty, route)
+        elif self.version == 3:
+            sqrtPriceLimitX96 = 0
+            if exact_input:
+                return self.quoter.functions.quoteExactInputSingle(
+                    token0, token1, fee, qty, sqrtPriceLimitX96
+                )
+            return self.quoter.functions.quoteExactOutputSingle(
+                token0, token1, fee, qty, sqrtPriceLimitX96
+            )
+        else:
+            raise ValueError  # pragma: no cover
+
     def _get_eth_token_input_price(
         self,
         token: AddressLike,  # output token
@@ -448,8 +699,14 @@ class Uniswap:
         fee: Optional[int] = None,
         slippage: Optional[float] = None,
         fee_on_transfer: bool = False,
+        min_amount_out: Optional[int] = None,
     ) -> HexBytes:
-        """Make a trade by defining the qty of the input token."""
+        """
+        Make a trade by defining the qty of the input token.
+
+        :param min_amount_out: Min. amount of the output token to accept. Derived from a quote and `slippage` if not set,
+            except on v1, where it defaults to `qty` for ETH to token and 1 for token to ETH trades.
+        """
         if not isinstance(qty, int):
             raise TypeError("swapped quantity must be an integer")
 
@@ -463,11 +720,23 @@ class Uniswap:
 
         if input_token == ETH_ADDRESS:
             return self._eth_to_token_swap_input(
-                output_token, Wei(qty), recipient, fee, slippage, fee_on_transfer
+                output_token,
+                Wei(qty),
+                recipient,
+                fee,
+                slippage,
+                fee_on_transfer,
+                min_amount_out,
             )
         elif output_token == ETH_ADDRESS:
             return self._token_to_eth_swap_input(
-                input_token, qty, recipient, fee, slippage, fee_on_transfer
+                input_token,
+                qty,
+                recipient,
+                fee,
+                slippage,
+                fee_on_transfer,
+                min_amount_out,
             )
         else:
             return self._token_to_token_swap_input(
@@ -478,6 +747,7 @@ class Uniswap:
                 fee,
                 slippage,
                 fee_on_transfer,
+                min_amount_out,
             )
 
     @check_approval
@@ -500,10 +770,6 @@ class Uniswap:
             raise ValueError
 
         if input_token == ETH_ADDRESS:
-            balance = self.get_eth_balance()
-            need = self._get_eth_token_output_price(output_token, qty, fee)
-            if balance < need:
-                raise InsufficientBalance(balance, need)
             return self._eth_to_token_swap_output(
                 output_token, qty, recipient, fee, slippage
             )
@@ -524,19 +790,22 @@ class Uniswap:
         fee: int,
         slippage: float,
         fee_on_transfer: bool = False,
+        min_amount_out: Optional[int] = None,
     ) -> HexBytes:
         """Convert ETH to tokens given an input amount."""
         if output_token == ETH_ADDRESS:
             raise ValueError
 
-        eth_balance = self.get_eth_balance()
+        eth_balance, amount_out_min = self._get_balance_and_min_amount_out(
+            _str_to_addr(ETH_ADDRESS), output_token, qty, fee, slippage, min_amount_out
+        )
         if qty > eth_balance:
             raise InsufficientBalance(eth_balance, qty)
 
         if self.version == 1:
             token_funcs = self._exchange_contract(output_token).functions
             tx_params = self._get_tx_params(qty)
-            func_params: List[Any] = [qty, self._deadline()]
+            func_params: List[Any] = [amount_out_min, self._deadline()]
             if not recipient:
                 function = token_funcs.ethToTokenSwapInput(*func_params)
             else:
@@ -547,9 +816,6 @@ class Uniswap:
         elif self.version == 2:
             if recipient is None:
                 recipient = self.address
-            amount_out_min = int(
-                (1 - slippage) * self._get_eth_token_input_price(output_token, qty, fee)
-            )
             if fee_on_transfer:
                 func = (
                     self.router.functions.swapExactETHForTokensSupportingFeeOnTransferTokens
@@ -572,10 +838,6 @@ class Uniswap:
             if fee_on_transfer:
                 raise Exception("fee on transfer not supported by Uniswap v3")
 
-            min_tokens_bought = int(
-                (1 - slippage)
-                * self._get_eth_token_input_price(output_token, qty, fee=fee)
-            )
             sqrtPriceLimitX96 = 0
 
             return self._build_and_send_tx(
@@ -587,7 +849,7 @@ class Uniswap:
                         "recipient": recipient,
                         "deadline": self._deadline(),
                         "amountIn": qty,
-                        "amountOutMinimum": min_tokens_bought,
+                        "amountOutMinimum": amount_out_min,
                         "sqrtPriceLimitX96": sqrtPriceLimitX96,
                     }
                 ),
@@ -604,19 +866,22 @@ class Uniswap:
         fee: int,
         slippage: float,
         fee_on_transfer: bool = False,
+        min_amount_out: Optional[int] = None,
     ) -> HexBytes:
         """Convert tokens to ETH given an input amount."""
         if input_token == ETH_ADDRESS:
             raise ValueError
 
         # Balance check
-        input_balance = self.get_token_balance(input_token)
+        input_balance, amount_out_min = self._get_balance_and_min_amount_out(
+            input_token, _str_to_addr(ETH_ADDRESS), qty, fee, slippage, min_amount_out
+        )
         if qty > input_balance:
             raise InsufficientBalance(input_balance, qty)
 
         if self.version == 1:
             token_funcs = self._exchange_contract(input_token).functions
-            func_params: List[Any] = [qty, 1, self._deadline()]
+            func_params: List[Any] = [qty, amount_out_min, self._deadline()]
             if not recipient:
                 function = token_funcs.tokenToEthSwapInput(*func_params)
             else:
@@ -626,9 +891,6 @@ class Uniswap:
         elif self.version == 2:
             if recipient is None:
                 recipient = self.address
-            amount_out_min = int(
-                (1 - slippage) * self._get_token_eth_input_price(input_token, qty, fee)
-            )
             if fee_on_transfer:
                 func = (
                     self.router.functions.swapExactTokensForETHSupportingFeeOnTransferTokens
@@ -652,10 +914,6 @@ class Uniswap:
                 raise Exception("fee on transfer not supported by Uniswap v3")
 
             output_token = self.get_weth_address()
-            min_tokens_bought = int(
-                (1 - slippage)
-                * self._get_token_eth_input_price(input_token, qty, fee=fee)
-            )
             sqrtPriceLimitX96 = 0
 
             swap_data = self.router.encodeABI(
@@ -668,14 +926,14 @@ class Uniswap:
                         ETH_ADDRESS,
                         self._deadline(),
                         qty,
-                        min_tokens_bought,
+                        amount_out_min,
                         sqrtPriceLimitX96,
                     )
                 ],
             )
 
             unwrap_data = self.router.encodeABI(
-                fn_name="unwrapWETH9", args=[min_tokens_bought, recipient]
+                fn_name="unwrapWETH9", args=[amount_out_min, recipient]
             )
 
             # Multicall
@@ -695,30 +953,31 @@ class Uniswap:
         fee: int,
         slippage: float,
         fee_on_transfer: bool = False,
+        min_amount_out: Optional[int] = None,
     ) -> HexBytes:
         """Convert tokens to tokens given an input amount."""
+        if input_token == ETH_ADDRESS:
+            raise ValueError
+        elif output_token == ETH_ADDRESS:
+            raise ValueError
+
         # Balance check
-        input_balance = self.get_token_balance(input_token)
+        input_balance, amount_out_min = self._get_balance_and_min_amount_out(
+            input_token, output_token, qty, fee, slippage, min_amount_out
+        )
         if qty > input_balance:
             raise InsufficientBalance(input_balance, qty)
 
         if recipient is None:
             recipient = self.address
 
-        if input_token == ETH_ADDRESS:
-            raise ValueError
-        elif output_token == ETH_ADDRESS:
-            raise ValueError
-
         if self.version == 1:
             token_funcs = self._exchange_contract(input_token).functions
-            # TODO: This might not be correct
-            min_tokens_bought, min_eth_bought = self._calculate_max_output_token(
-                input_token, qty, output_token
-            )
+            # The min. amount of the output token already bounds the intermediate ETH amount
+            min_eth_bought = 1
             func_params = [
                 qty,
-                min_tokens_bought,
+                amount_out_min,
                 min_eth_bought,
                 self._deadline(),
                 output_token,
@@ -730,12 +989,6 @@ class Uniswap:
                 function = token_funcs.tokenToTokenTransferInput(*func_params)
             return self._build_and_send_tx(function)
         elif self.version == 2:
-            min_tokens_bought = int(
-                (1 - slippage)
-                * self._get_token_token_input_price(
-                    input_token, output_token, qty, fee=fee
-                )
-            )
             if fee_on_transfer:
                 func = (
                     self.router.functions.swapExactTokensForTokensSupportingFeeOnTransferTokens
@@ -745,7 +998,7 @@ class Uniswap:
             return self._build_and_send_tx(
                 func(
                     qty,
-                    min_tokens_bought,
+                    amount_out_min,
                     [input_token, self.get_weth_address(), output_token],
                     recipient,
                     self._deadline(),
@@ -755,12 +1008,6 @@ class Uniswap:
             if fee_on_transfer:
                 raise Exception("fee on transfer not supported by Uniswap v3")
 
-            min_tokens_bought = int(
-                (1 - slippage)
-                * self._get_token_token_input_price(
-                    input_token, output_token, qty, fee=fee
-                )
-            )
             sqrtPriceLimitX96 = 0
 
             return self._build_and_send_tx(
@@ -772,7 +1019,7 @@ class Uniswap:
                         "recipient": recipient,
                         "deadline": self._deadline(),
                         "amountIn": qty,
-                        "amountOutMinimum": min_tokens_bought,
+                        "amountOutMinimum": amount_out_min,
                         "sqrtPriceLimitX96": sqrtPriceLimitX96,
                     }
                 ),
@@ -794,9 +1041,10 @@ class Uniswap:
             raise ValueError
 
         # Balance check
-        eth_balance = self.get_eth_balance()
-        cost = self._get_eth_token_output_price(output_token, qty, fee)
-        amount_in_max = Wei(int((1 + slippage) * cost))
+        eth_balance, cost = self._get_balance_and_price(
+            _str_to_addr(ETH_ADDRESS), output_token, qty, fee, exact_input=False
+        )
+        amount_in_max = Wei(_add_slippage(cost, slippage))
 
         # We check balance against amount_in_max rather than cost to be conservative
         if amount_in_max > eth_balance:
@@ -804,8 +1052,7 @@ class Uniswap:
 
         if self.version == 1:
             token_funcs = self._exchange_contract(output_token).functions
-            eth_qty = self._get_eth_token_output_price(output_token, qty)
-            tx_params = self._get_tx_params(eth_qty)
+            tx_params = self._get_tx_params(Wei(cost))
             func_params: List[Any] = [qty, self._deadline()]
             if not recipient:
                 function = token_funcs.ethToTokenSwapOutput(*func_params)
@@ -816,10 +1063,6 @@ class Uniswap:
         elif self.version == 2:
             if recipient is None:
                 recipient = self.address
-            eth_qty = int(
-                (1 + slippage)
-                * self._get_eth_token_output_price(output_token, qty, fee)
-            )  # type: ignore
             return self._build_and_send_tx(
                 self.router.functions.swapETHForExactTokens(
                     qty,
@@ -827,7 +1070,7 @@ class Uniswap:
                     recipient,
                     self._deadline(),
                 ),
-                self._get_tx_params(eth_qty),
+                self._get_tx_params(amount_in_max),
             )
         elif self.version == 3:
             if recipient is None:
@@ -874,29 +1117,21 @@ class Uniswap:
             raise ValueError
 
         # Balance check
-        input_balance = self.get_token_balance(input_token)
-        cost = self._get_token_eth_output_price(input_token, qty, fee)
-        amount_in_max = int((1 + slippage) * cost)
+        input_balance, cost = self._get_balance_and_price(
+            input_token, _str_to_addr(ETH_ADDRESS), qty, fee, exact_input=False
+        )
+        amount_in_max = _add_slippage(cost, slippage)
 
         # We check balance against amount_in_max rather than cost to be conservative
         if amount_in_max > input_balance:
             raise InsufficientBalance(input_balance, amount_in_max)
 
         if self.version == 1:
-            # From https://uniswap.org/docs/v1/frontend-integration/trade-tokens/
-            # Is all this really necessary? Can't we just use `cost` for max_tokens?
-            outputAmount = qty
-            inputReserve = self.get_ex_token_balance(input_token)
-            outputReserve = self.get_ex_eth_balance(input_token)
-
-            numerator = outputAmount * inputReserve * 1000
-            denominator = (outputReserve - outputAmount) * 997
-            inputAmount = numerator / denominator + 1
-
-            max_tokens = int((1 + slippage) * inputAmount)
-
+            # getTokenToEthOutputPrice computes `cost` from the exchange's reserves,
+            # exactly as https://uniswap.org/docs/v1/frontend-integration/trade-tokens/
+            # describes, so it doesn't have to be recomputed here.
             ex = self._exchange_contract(input_token)
-            func_params: List[Any] = [qty, max_tokens, self._deadline()]
+            func_params: List[Any] = [qty, amount_in_max, self._deadline()]
             if not recipient:
                 function = ex.functions.tokenToEthSwapOutput(*func_params)
             else:
@@ -906,12 +1141,10 @@ class Uniswap:
         elif self.version == 2:
             if recipient is None:
                 recipient = self.address
-
-            max_tokens = int((1 + slippage) * cost)
             return self._build_and_send_tx(
                 self.router.functions.swapTokensForExactETH(
                     qty,
-                    max_tokens,
+                    amount_in_max,
                     [input_token, self.get_weth_address()],
                     recipient,
                     self._deadline(),
@@ -970,9 +1203,10 @@ class Uniswap:
             raise ValueError
 
         # Balance check
-        input_balance = self.get_token_balance(input_token)
-        cost = self._get_token_token_output_price(input_token, output_token, qty, fee)
-        amount_in_max = int((1 + slippage) * cost)
+        input_balance, cost = self._get_balance_and_price(
+            input_token, output_token, qty, fee, exact_input=False
+        )
+        amount_in_max = _add_slippage(cost, slippage)
         if (
             amount_in_max > input_balance
         ):  # We check balance against amount_in_max rather than cost to be conservative
@@ -981,7 +1215,7 @@ class Uniswap:
         if self.version == 1:
             token_funcs = self._exchange_contract(input_token).functions
             max_tokens_sold, max_eth_sold = self._calculate_max_input_token(
-                input_token, qty, output_token
+                input_token, qty, output_token, slippage
             )
             tx_params = self._get_tx_params()
             func_params = [
@@ -1000,10 +1234,6 @@ class Uniswap:
         elif self.version == 2:
             if recipient is None:
                 recipient = self.address
-            cost = self._get_token_token_output_price(
-                input_token, output_token, qty, fee=fee
-            )
-            amount_in_max = int((1 + slippage) * cost)
             return self._build_and_send_tx(
                 self.router.functions.swapTokensForExactTokens(
                     qty,
@@ -1051,6 +1281,127 @@ class Uniswap:
         balance: int = erc20.functions.balanceOf(self.address).call()
         return balance
 
+    # ------ Async ---------------------------------------------------------------------
+    # The async methods run their sync counterpart in the event loop's default executor,
+    # so that independent RPC calls can be awaited concurrently (e.g. with asyncio.gather).
+    # Transactions are still sent one at a time, see _build_and_send_tx.
+
+    async def _run_in_executor(
+        self, func: Callable[P, T], *args: P.args, **kwargs: P.kwargs
+    ) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(func, *args, **kwargs)
+        )
+
+    async def aget_price_input(
+        self,
+        token0: AddressLike,
+        token1: AddressLike,
+        qty: int,
+        fee: Optional[int] = None,
+        route: Optional[List[AddressLike]] = None,
+    ) -> int:
+        """Async version of :meth:`get_price_input`."""
+        return await self._run_in_executor(
+            self.get_price_input, token0, token1, qty, fee, route
+        )
+
+    async def aget_price_output(
+        self,
+        token0: AddressLike,
+        token1: AddressLike,
+        qty: int,
+        fee: Optional[int] = None,
+        route: Optional[List[AddressLike]] = None,
+    ) -> int:
+        """Async version of :meth:`get_price_output`."""
+        return await self._run_in_executor(
+            self.get_price_output, token0, token1, qty, fee, route
+        )
+
+    async def aget_prices_input(
+        self,
+        token0: AddressLike,
+        tokens1: Sequence[AddressLike],
+        qty: int,
+        fee: Optional[int] = None,
+    ) -> List[int]:
+        """Async version of :meth:`get_prices_input`."""
+        return await self._run_in_executor(
+            self.get_prices_input, token0, tokens1, qty, fee
+        )
+
+    async def aget_prices_output(
+        self,
+        token0: AddressLike,
+        tokens1: Sequence[AddressLike],
+        qty: int,
+        fee: Optional[int] = None,
+    ) -> List[int]:
+        """Async version of :meth:`get_prices_output`."""
+        return await self._run_in_executor(
+            self.get_prices_output, token0, tokens1, qty, fee
+        )
+
+    async def aget_eth_balance(self) -> Wei:
+        """Async version of :meth:`get_eth_balance`."""
+        return await self._run_in_executor(self.get_eth_balance)
+
+    async def aget_token_balance(self, token: AddressLike) -> int:
+        """Async version of :meth:`get_token_balance`."""
+        return await self._run_in_executor(self.get_token_balance, token)
+
+    async def amake_trade(
+        self,
+        input_token: AddressLike,
+        output_token: AddressLike,
+        qty: Union[int, Wei],
+        recipient: Optional[AddressLike] = None,
+        fee: Optional[int] = None,
+        slippage: Optional[float] = None,
+        fee_on_transfer: bool = False,
+        min_amount_out: Optional[int] = None,
+    ) -> HexBytes:
+        """Async version of :meth:`make_trade`."""
+        return await self._run_in_executor(
+            self.make_trade,
+            input_token,
+            output_token,
+            qty,
+            recipient,
+            fee,
+            slippage,
+            fee_on_transfer,
+            min_amount_out,
+        )
+
+    async def amake_trade_output(
+        self,
+        input_token: AddressLike,
+        output_token: AddressLike,
+        qty: Union[int, Wei],
+        recipient: Optional[AddressLike] = None,
+        fee: Optional[int] = None,
+        slippage: Optional[float] = None,
+    ) -> HexBytes:
+        """Async version of :meth:`make_trade_output`."""
+        return await self._run_in_executor(
+            self.make_trade_output,
+            input_token,
+            output_token,
+            qty,
+            recipient,
+            fee,
+            slippage,
+        )
+
+    async def aapprove(
+        self, token: AddressLike, max_approval: Optional[int] = None
+    ) -> None:
+        """Async version of :meth:`approve`."""
+        await self._run_in_executor(self.approve, token, max_approval)
+
     # ------ ERC20 Pool ----------------------------------------------------------------
     @supports([1])
     def get_ex_eth_balance(self, token: AddressLike) -> int:
@@ -1067,12 +1418,45 @@ class Uniswap:
         ).call()
         return balance
 
+    @supports([1])
+    def _get_ex_reserves(self, *tokens: AddressLike) -> List[Tuple[int, int]]:
+        """
+        Get the ETH and token balances of the exchange contracts of the given tokens,
+        as ``(eth_reserve, token_reserve)`` tuples, using a single multicall.
+        """
+        if self.multicall2 is None:
+            return [
+                (self.get_ex_eth_balance(token), self.get_ex_token_balance(token))
+                for token in tokens
+            ]
+        calls = []
+        for token in tokens:
+            ex_addr = self._exchange_address_from_token(token)
+            erc20 = _load_contract_erc20(self.w3, token)
+            calls += [
+                (
+                    self.multicall2.address,
+                    HexBytes(
+                        self.multicall2.functions.getEthBalance(
+                            ex_addr
+                        )._encode_transaction_data()
+                    ),
+                ),
+                (
+                    erc20.address,
+                    HexBytes(
+                        erc20.functions.balanceOf(ex_addr)._encode_transaction_data()
+                    ),
+                ),
+            ]
+        results = self.multicall(calls, ["uint256"])
+        return [(results[i][0], results[i + 1][0]) for i in range(0, len(results), 2)]
+
     # TODO: ADD TOTAL SUPPLY
     @supports([1])
     def get_exchange_rate(self, token: AddressLike) -> float:
         """Get the current ETH/token exchange rate of the token."""
-        eth_reserve = self.get_ex_eth_balance(token)
-        token_reserve = self.get_ex_token_balance(token)
+        ((eth_reserve, token_reserve),) = self._get_ex_reserves(token)
         return float(token_reserve / eth_reserve)
 
     # ------ Liquidity -----------------------------------------------------------------
@@ -1085,14 +1469,16 @@ class Uniswap:
         tx_params = self._get_tx_params(max_eth)
         # Add 1 to avoid rounding errors, per
         # https://hackmd.io/hthz9hXKQmSyXfMbPsut1g#Add-Liquidity-Calculations
-        max_token = int(max_eth * self.get_exchange_rate(token)) + 10
+        ((eth_reserve, token_reserve),) = self._get_ex_reserves(token)
+        # Integer math, as a float exchange rate loses precision for large reserves
+        max_token = max_eth * token_reserve // eth_reserve + 10
         func_params = [min_liquidity, max_token, self._deadline()]
         function = self._exchange_contract(token).functions.addLiquidity(*func_params)
         return self._build_and_send_tx(function, tx_params)
 
     @supports([1])
     @check_approval
-    def remove_liquidity(self, token: str, max_token: int) -> HexBytes:
+    def remove_liquidity(self, token: AddressLike, max_token: int) -> HexBytes:
         """Remove liquidity from the pool."""
         func_params = [int(max_token), 1, 1, self._deadline()]
         function = self._exchange_contract(token).functions.removeLiquidity(
@@ -1162,6 +1548,7 @@ class Uniswap:
                 deadline,
             )
         ).transact({"from": _addr_to_str(self.address)})
+        self._mark_nonce_stale()
         receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
         return receipt
 
@@ -1205,6 +1592,7 @@ class Uniswap:
         tx_burn = self.nonFungiblePositionManager.functions.burn(tokenId).transact(
             {"from": _addr_to_str(self.address)}
         )
+        self._mark_nonce_stale()
         receipt = self.w3.eth.wait_for_transaction_receipt(tx_burn)
 
         return receipt
@@ -1390,40 +1778,85 @@ class Uniswap:
     # ------ Approval Utils ------------------------------------------------------------
     def approve(self, token: AddressLike, max_approval: Optional[int] = None) -> None:
         """Give an exchange/router max approval of a token."""
+        self.approve_many([token], max_approval)
+
+    def approve_many(
+        self, tokens: Sequence[AddressLike], max_approval: Optional[int] = None
+    ) -> None:
+        """
+        Give an exchange/router max approval of several tokens.
+
+        All approvals are sent before waiting for any receipt, so they can be mined in the same block.
+        """
         max_approval = self.max_approval_int if not max_approval else max_approval
-        contract_addr = (
-            self._exchange_address_from_token(token)
-            if self.version == 1
-            else self.router_address
-        )
-        function = _load_contract_erc20(self.w3, token).functions.approve(
-            contract_addr, max_approval
-        )
-        logger.warning(f"Approving {_addr_to_str(token)}...")
-        tx = self._build_and_send_tx(function)
-        self.w3.eth.wait_for_transaction_receipt(tx, timeout=6000)
+        txs = []
+        for token in tokens:
+            function = _load_contract_erc20(self.w3, token).functions.approve(
+                self._get_spender(token), max_approval
+            )
+            logger.warning(f"Approving {_addr_to_str(token)}...")
+            txs.append(self._build_and_send_tx(function))
+
+        for token, tx in zip(tokens, txs):
+            receipt = self.w3.eth.wait_for_transaction_receipt(tx, timeout=6000)
+            if receipt["status"] != 1:
+                raise Exception(
+                    f"Approval of {_addr_to_str(token)} failed (tx: {tx.hex()})"
+                )
+            # Wait (briefly) until the allowance is visible, as a load-balanced
+            # provider may answer from a node that has not seen the block yet.
+            # Reaching the approval threshold is enough, as some tokens cap the allowance.
+            for _ in range(APPROVAL_POLL_ATTEMPTS):
+                allowance = self._get_allowance(token)
+                if allowance >= min(max_approval, self.max_approval_check_int):
+                    break
+                time.sleep(APPROVAL_POLL_INTERVAL)
+            # Some tokens cap the allowance (e.g. to uint96), so only the observed allowance counts
+            if allowance >= self.max_approval_check_int:
+                self._approved.add(_str_to_addr(token))
+
+    def invalidate_approval(self, token: AddressLike) -> None:
+        """
+        Forget that a token is approved, so that the allowance is checked again before the next trade.
 
-        # Add extra sleep to let tx propagate correctly
-        time.sleep(1)
+        Only needed if the approval was revoked outside of this instance.
+        """
+        self._approved.discard(_str_to_addr(token))
 
     def _is_approved(self, token: AddressLike) -> bool:
-        """Check to see if the exchange and token is approved."""
+        """
+        Check to see if the exchange and token is approved.
+
+        Once a token is known to be approved it is not checked again, as the allowance
+        only drops below the threshold after an unrealistic amount of trading
+        (or if revoked, see :meth:`invalidate_approval`).
+        """
         _validate_address(token)
+        if _str_to_addr(token) in self._approved:
+            return True
+        amount = self._get_allowance(token)
+        if amount >= self.max_approval_check_int:
+            self._approved.add(_str_to_addr(token))
+            return True
+        else:
+            return False
+
+    def _get_spender(self, token: AddressLike) -> AddressLike:
+        """Get the address that needs an allowance of the token to trade it."""
         if self.version == 1:
-            contract_addr = self._exchange_address_from_token(token)
+            return self._exchange_address_from_token(token)
         elif self.version in [2, 3]:
-            contract_addr = self.router_address
+            return self.router_address
         else:
             raise ValueError
-        amount = (
+
+    def _get_allowance(self, token: AddressLike) -> int:
+        allowance: int = (
             _load_contract_erc20(self.w3, token)
-            .functions.allowance(self.address, contract_addr)
+            .functions.allowance(self.address, self._get_spender(token))
             .call()
         )
-        if amount >= self.max_approval_check_int:
-            return True
-        else:
-            return False
+        return allowance
 
     # ------ Tx Utils ------------------------------------------------------------------
     def _deadline(self) -> int:
@@ -1433,22 +1866,34 @@ class Uniswap:
     def _build_and_send_tx(
         self, function: ContractFunction, tx_params: Optional[TxParams] = None
     ) -> HexBytes:
-        """Build and send a transaction."""
+        """
+        Build and send a transaction.
+
+        The nonce is assigned here, while holding a lock, so that transactions can be sent from several threads.
+        """
         if not tx_params:
             tx_params = self._get_tx_params()
-        transaction = function.build_transaction(tx_params)
+        with self._nonce_lock:
+            tx_params["nonce"] = self._get_nonce()
+            return self._sign_and_send_tx(function, tx_params)
 
-        if "gas" not in tx_params:
-            # `use_estimate_gas` needs to be True for networks like Arbitrum (can't assume 250000 gas),
-            # but it breaks tests for unknown reasons because estimate_gas takes forever on some tx's.
-            # Maybe an issue with ganache? (got GC warnings once...)
-            if self.use_estimate_gas:
-                # The Uniswap V3 UI uses 20% margin for transactions
-                transaction["gas"] = Wei(
-                    int(self.w3.eth.estimate_gas(transaction) * 1.2)
-                )
-            else:
-                transaction["gas"] = Wei(250_000)
+    def _sign_and_send_tx(
+        self, function: ContractFunction, tx_params: TxParams
+    ) -> HexBytes:
+        """Sign and send a transaction with the nonce in `tx_params`. The caller must hold ``_nonce_lock``."""
+        # `use_estimate_gas` needs to be True for networks like Arbitrum (can't assume 250000 gas),
+        # but it breaks tests for unknown reasons because estimate_gas takes forever on some tx's.
+        # Maybe an issue with ganache? (got GC warnings once...)
+        estimate_gas = "gas" not in tx_params and self.use_estimate_gas
+        if "gas" not in tx_params and not self.use_estimate_gas:
+            tx_params["gas"] = Wei(250_000)
+
+        # build_transaction encodes the call data and, if gas is missing, estimates it
+        # for us, so neither needs to be repeated below.
+        transaction = function.build_transaction(tx_params)
+        if estimate_gas:
+            # The Uniswap V3 UI uses 20% margin for transactions
+            transaction["gas"] = Wei(int(transaction["gas"] * 1.2))
 
         signed_txn = self.w3.eth.account.sign_transaction(
             transaction, private_key=self.private_key
@@ -1456,89 +1901,124 @@ class Uniswap:
         # TODO: This needs to get more complicated if we want to support replacing a transaction
         # FIXME: This does not play nice if transactions are sent from other places using the same wallet.
         try:
-            return self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-        finally:
-            logger.debug(f"nonce: {tx_params['nonce']}")
-            self.last_nonce = Nonce(tx_params["nonce"] + 1)
+            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+        except Exception:
+            # The nonce might have been used by a transaction sent from elsewhere, or not
+            # at all if the node rejected it, so start over from the node's count.
+            try:
+                self.resync_nonce()
+            except Exception as e:
+                # Don't hide the original error (e.g. if the node is unreachable)
+                logger.warning(f"Failed to resync nonce: {e}")
+                self._mark_nonce_stale()
+            raise
+        logger.debug(f"nonce: {tx_params['nonce']}")
+        self.last_nonce = Nonce(tx_params["nonce"] + 1)
+        return tx_hash
 
     def _get_tx_params(
         self, value: Wei = Wei(0), gas: Optional[Wei] = None
     ) -> TxParams:
         """Get generic transaction parameters."""
-        params: TxParams = {
-            "from": _addr_to_str(self.address),
-            "value": value,
-            "nonce": max(
-                self.last_nonce, self.w3.eth.get_transaction_count(self.address)
-            ),
-        }
+        params: TxParams = {**self._tx_params_template, "value": value}
 
         if gas:
             params["gas"] = gas
 
         return params
 
+    def resync_nonce(self) -> None:
+        """
+        Refetch the nonce from the node (including pending transactions).
+
+        Useful after sending transactions from the same wallet outside of this instance,
+        in particular with ``exclusive_wallet``.
+        """
+        with self._nonce_lock:
+            self.last_nonce = self.w3.eth.get_transaction_count(self.address, "pending")
+            self._nonce_synced_at = time.time()
+
+    def _mark_nonce_stale(self) -> None:
+        """Refetch the nonce before the next transaction, after one was sent bypassing the locally tracked nonce (e.g. with ``transact()``)."""
+        with self._nonce_lock:
+            self._nonce_synced_at = 0.0
+
+    def _get_nonce(self) -> Nonce:
+        """
+        Get the nonce for the next transaction.
+
+        Only asks the node for the transaction count every ``NONCE_RESYNC_INTERVAL`` seconds
+        (or only once with ``exclusive_wallet``), and otherwise relies on the locally tracked nonce.
+        """
+        now = time.time()
+        if self._nonce_synced_at == 0.0 or (
+            not self.exclusive_wallet
+            and now - self._nonce_synced_at > NONCE_RESYNC_INTERVAL
+        ):
+            self.last_nonce = max(
+                self.last_nonce,
+                self.w3.eth.get_transaction_count(self.address, "pending"),
+            )
+            self._nonce_synced_at = now
+        return self.last_nonce
+
     # ------ Price Calculation Utils ---------------------------------------------------
     def _calculate_max_input_token(
-        self, input_token: AddressLike, qty: int, output_token: AddressLike
+        self,
+        input_token: AddressLike,
+        qty: int,
+        output_token: AddressLike,
+        slippage: float,
     ) -> Tuple[int, int]:
         """
         For buy orders (exact output), the cost (input) is calculated.
-        Calculate the max input and max eth sold for a token to token output swap.
+        Calculate the max input and max eth sold for a token to token output swap,
+        with `slippage` applied to both.
         Equation from:
          - https://hackmd.io/hthz9hXKQmSyXfMbPsut1g
          - https://uniswap.org/docs/v1/frontend-integration/trade-tokens/
         """
-        # Buy TokenB with ETH
-        output_amount_b = qty
-        input_reserve_b = self.get_ex_eth_balance(output_token)
-        output_reserve_b = self.get_ex_token_balance(output_token)
-
-        # Cost
-        numerator_b = output_amount_b * input_reserve_b * 1000
-        denominator_b = (output_reserve_b - output_amount_b) * 997
-        input_amount_b = numerator_b / denominator_b + 1
+        # All four reserves are fetched in a single call
+        reserves_b, reserves_a = self._get_ex_reserves(output_token, input_token)
+        eth_reserve_b, token_reserve_b = reserves_b
+        eth_reserve_a, token_reserve_a = reserves_a
 
+        # Buy TokenB with ETH
+        eth_amount = _get_amount_in(qty, eth_reserve_b, token_reserve_b)
         # Buy ETH with TokenA
-        output_amount_a = input_amount_b
-        input_reserve_a = self.get_ex_token_balance(input_token)
-        output_reserve_a = self.get_ex_eth_balance(input_token)
-
-        # Cost
-        numerator_a = output_amount_a * input_reserve_a * 1000
-        denominator_a = (output_reserve_a - output_amount_a) * 997
-        input_amount_a = numerator_a / denominator_a - 1
+        token_amount_a = _get_amount_in(eth_amount, token_reserve_a, eth_reserve_a)
 
-        return int(input_amount_a), int(1.2 * input_amount_b)
+        return (
+            _add_slippage(token_amount_a, slippage),
+            _add_slippage(eth_amount, slippage),
+        )
 
     def _calculate_max_output_token(
-        self, output_token: AddressLike, qty: int, input_token: AddressLike
+        self,
+        input_token: AddressLike,
+        qty: int,
+        output_token: AddressLike,
+        slippage: float,
     ) -> Tuple[int, int]:
         """
         For sell orders (exact input), the amount bought (output) is calculated.
-        Similar to _calculate_max_input_token, but for an exact input swap.
+        Similar to _calculate_max_input_token, but for an exact input swap,
+        so it returns the min. output and min. eth bought.
         """
-        # TokenA (ERC20) to ETH conversion
-        inputAmountA = qty
-        inputReserveA = self.get_ex_token_balance(input_token)
-        outputReserveA = self.get_ex_eth_balance(input_token)
-
-        # Cost
-        numeratorA = inputAmountA * outputReserveA * 997
-        denominatorA = inputReserveA * 1000 + inputAmountA * 997
-        outputAmountA = numeratorA / denominatorA
+        # All four reserves are fetched in a single call
+        reserves_a, reserves_b = self._get_ex_reserves(input_token, output_token)
+        eth_reserve_a, token_reserve_a = reserves_a
+        eth_reserve_b, token_reserve_b = reserves_b
 
+        # TokenA (ERC20) to ETH conversion
+        eth_amount = _get_amount_out(qty, token_reserve_a, eth_reserve_a)
         # ETH to TokenB conversion
-        inputAmountB = outputAmountA
-        inputReserveB = self.get_ex_token_balance(output_token)
-        outputReserveB = self.get_ex_eth_balance(output_token)
-
-        # Cost
-        numeratorB = inputAmountB * outputReserveB * 997
-        denominatorB = inputReserveB * 1000 + inputAmountB * 997
-        outputAmountB = numeratorB / denominatorB
+        token_amount_b = _get_amount_out(eth_amount, eth_reserve_b, token_reserve_b)
 
-        return int(outputAmountB), int(1.2 * outputAmountA)
+        return (
+            _sub_slippage(token_amount_b, slippage),
+            _sub_slippage(eth_amount, slippage),
+        )
 
     # ------ Helpers ------------------------------------------------------------
 
@@ -1549,7 +2029,7 @@ class Uniswap:
         output_types: Sequence[str],
     ) -> List[Any]:
         """
-        Calls aggregate() on Uniswap Multicall2 contract
+        Calls aggregate() on Uniswap Multicall2 contract (or makes the calls one by one, where it isn't deployed)
 
         Params
         ------
@@ -1561,13 +2041,7 @@ class Uniswap:
 
         returns decoded results
         """
-        params = [
-            {"target": target, "callData": callData}
-            for target, callData in encoded_functions
-        ]
-        _, results = self.multicall2.functions.aggregate(params).call(
-            block_identifier="latest"
-        )
+        results = self._multicall_raw(encoded_functions)
         decoded_results = [
             self.w3.codec.decode(output_types, multicall_result)
             for multicall_result in results
@@ -1578,12 +2052,66 @@ class Uniswap:
         ]
         return normalized_results
 
+    def _multicall_raw(
+        self, encoded_functions: Sequence[Tuple[ChecksumAddress, bytes]]
+    ) -> List[bytes]:
+        """
+        Calls aggregate() on Multicall2 and returns the undecoded return data of each call,
+        for batches where the calls don't share the same output types.
+        """
+        if self.multicall2 is None:
+            # No Multicall2 on this network, make the calls one by one instead
+            return [self._call_raw(target, data) for target, data in encoded_functions]
+        params = [
+            {"target": target, "callData": callData}
+            for target, callData in encoded_functions
+        ]
+        _, results = self.multicall2.functions.aggregate(params).call(
+            block_identifier="latest"
+        )
+        return list(results)
+
+    def _multicall_try_raw(
+        self, encoded_functions: Sequence[Tuple[ChecksumAddress, bytes]]
+    ) -> List[Tuple[bool, bytes]]:
+        """
+        Calls tryAggregate() on Multicall2, which unlike aggregate() doesn't revert if one of the calls reverts.
+
+        Returns the success flag and undecoded return data of each call.
+        """
+        if self.multicall2 is None:
+            # No Multicall2 on this network, make the calls one by one instead
+            raw_results = []
+            for target, data in encoded_functions:
+                try:
+                    raw_results.append((True, self._call_raw(target, data)))
+                except (ContractLogicError, ValueError):
+                    # ValueError is the node's own error for a reverted call, on some nodes
+                    raw_results.append((False, b""))
+            return raw_results
+        params = [
+            {"target": target, "callData": callData}
+            for target, callData in encoded_functions
+        ]
+        results = self.multicall2.functions.tryAggregate(False, params).call(
+            block_identifier="latest"
+        )
+        return [(success, data) for success, data in results]
+
+    def _call_raw(self, target: ChecksumAddress, data: bytes) -> bytes:
+        """A single eth_call, returning the undecoded return data."""
+        result = self.w3.eth.call({"to": target, "data": HexBytes(data)}, "latest")
+        return bytes(result)
+
     def get_token(self, address: AddressLike, abi_name: str = "erc20") -> ERC20Token:
         """
         Retrieves metadata from the ERC20 contract of a given token, like its name, symbol, and decimals.
+
+        Results are cached per instance, as token metadata doesn't change.
         """
-        # FIXME: This function should always return the same output for the same input
-        #        and would therefore benefit from caching
+        key = (_str_to_addr(address), abi_name)
+        if key in self._token_cache:
+            return self._token_cache[key]
         if address == "0x0000000000000000000000000000000000000000":
             # This isn't exactly right, but for all intents and purposes,
             # ETH is treated as a ERC20 by Uniswap.
@@ -1594,10 +2122,23 @@ class Uniswap:
                 decimals=18,
             )
         token_contract = _load_contract(self.w3, abi_name, address=address)
+        functions = [
+            token_contract.functions.name(),
+            token_contract.functions.symbol(),
+            token_contract.functions.decimals(),
+        ]
         try:
-            _name = token_contract.functions.name().call()
-            _symbol = token_contract.functions.symbol().call()
-            decimals = token_contract.functions.decimals().call()
+            if self.multicall2 is None:
+                _name, _symbol, decimals = (fn.call() for fn in functions)
+            else:
+                # All three are fetched in a single multicall
+                results = self._multicall_try_raw(
+                    [(fn.address, fn._encode_transaction_data()) for fn in functions]
+                )
+                _name, _symbol, decimals = (
+                    self._decode_function_result(fn, success, data)
+                    for fn, (success, data) in zip(functions, results)
+                )
         except Exception as e:
             logger.warning(
                 f"Exception occurred while trying to get token {_addr_to_str(address)}: {e}"
@@ -1611,12 +2152,29 @@ class Uniswap:
             symbol = _symbol.decode()
         except Exception:
             symbol = _symbol
-        return ERC20Token(symbol, address, name, decimals)
+        token = ERC20Token(symbol, address, name, decimals)
+        self._token_cache[key] = token
+        return token
+
+    def _decode_function_result(
+        self, function: ContractFunction, success: bool, data: bytes
+    ) -> Any:
+        """Decode the result of a call made through :meth:`_multicall_try_raw`, as ``function.call()`` would."""
+        if not success:
+            raise ContractLogicError(f"{function.fn_name} reverted")
+        output_types = [output["type"] for output in function.abi["outputs"]]
+        result = self.w3.codec.decode(output_types, data)
+        return result[0] if len(result) == 1 else result
 
-    @functools.lru_cache()
     @supports([2, 3])
     def get_weth_address(self) -> ChecksumAddress:
-        """Retrieves the WETH address from the contracts (which may vary between chains)."""
+        """
+        Retrieves the WETH address from the contracts (which may vary between chains).
+
+        The address is immutable per router, so it's only fetched once.
+        """
+        if self._weth_address is not None:
+            return self._weth_address
         if self.version == 2:
             # Contract calls should always return checksummed addresses
             address: ChecksumAddress = self.router.functions.WETH().call()
@@ -1629,6 +2187,7 @@ class Uniswap:
         # WETH9_ADDRESS = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
         # assert address == WETH9_ADDRESS, "WETH address mismatch"
 
+        self._weth_address = address
         return address
 
     @supports([3])
@@ -1668,6 +2227,7 @@ class Uniswap:
         tx = self.factory_contract.functions.createPool(token_0, token_1, fee).transact(
             {"from": address}
         )
+        self._mark_nonce_stale()
         receipt = self.w3.eth.wait_for_transaction_receipt(tx)
 
         event_logs = self.factory_contract.events.PoolCreated().process_receipt(receipt)
@@ -1781,13 +2341,14 @@ class Uniswap:
                 }
             ],
         )
-        print(position)
+        logger.debug("mint calldata: %s", position)
 
         multicall = positionManager.functions.multicall([position]).transact(
             {"from": _addr_to_str(self.address), "gas": Wei(417918)}
         )
+        self._mark_nonce_stale()
 
-        print(multicall)
+        logger.debug("mint tx: %r", multicall)
         # mint_position = positionManager.functions.mint({'token0':token0,'token1':token1,'fee':fee,'tickLower':MIN_TICK,'tickUpper':MAX_TICK,
         # 'amount0Desired':amount0,'amount1Desired':amount1,'amount0Min':0,'amount1Min':0,'recipient':_addr_to_str(self.address),'deadline':self._deadline()
         # })
@@ -1939,11 +2500,17 @@ class Uniswap:
 
     @supports([1])
     def _exchange_address_from_token(self, token_addr: AddressLike) -> AddressLike:
+        key = _str_to_addr(token_addr)
+        if key in self._exchange_address_cache:
+            return self._exchange_address_cache[key]
         ex_addr: AddressLike = self.factory_contract.functions.getExchange(
             token_addr
         ).call()
         # TODO: What happens if the token doesn't have an exchange/doesn't exist?
         #       Should probably raise an Exception (and test it)
+        if ex_addr != ETH_ADDRESS:
+            # Exchanges can't be replaced once created, but may not have been created yet
+            self._exchange_address_cache[key] = ex_addr
         return ex_addr
 
     @supports([1])
@@ -1955,7 +2522,6 @@ class Uniswap:
         )
         return token_addr
 
-    @functools.lru_cache()
     @supports([1])
     def _exchange_contract(
         self,
@@ -1966,10 +2532,14 @@ class Uniswap:
             ex_addr = self._exchange_address_from_token(token_addr)
         if ex_addr is None:
             raise InvalidToken(token_addr)
-        abi_name = "uniswap-v1/exchange"
-        contract = _load_contract(self.w3, abi_name=abi_name, address=ex_addr)
-        logger.info(f"Loaded exchange contract {contract} at {contract.address}")
-        return contract
+        # Cached per instance (rather than with lru_cache) so instances can be garbage collected
+        key = _str_to_addr(ex_addr)
+        if key not in self._exchange_contract_cache:
+            abi_name = "uniswap-v1/exchange"
+            contract = _load_contract(self.w3, abi_name=abi_name, address=ex_addr)
+            logger.info(f"Loaded exchange contract {contract} at {contract.address}")
+            self._exchange_contract_cache[key] = contract
+        return self._exchange_contract_cache[key]
 
     @supports([1])
     def _get_all_tokens(self) -> List[ERC20Token]:
@@ -1980,12 +2550,76 @@ class Uniswap:
         """
         # FIXME: This is a very expensive operation, would benefit greatly from caching.
         tokenCount = self.factory_contract.functions.tokenCount().call()
+
+        # Batching the getTokenWithId() and metadata calls, as one eth_call per token is way too slow.
+        # The batches are independent, so they're fetched concurrently.
+        with ThreadPoolExecutor() as executor:
+            addresses: List[ChecksumAddress] = []
+            for results in executor.map(
+                self._get_token_addresses, chunks(range(tokenCount), 100)
+            ):
+                # Skip tokens which are ETH
+                addresses += [address for address in results if address != ETH_ADDRESS]
+
+            tokens = []
+            for token_batch in executor.map(self._get_tokens, chunks(addresses, 100)):
+                tokens += token_batch
+        return tokens
+
+    def _get_token_addresses(self, token_ids: Sequence[int]) -> List[ChecksumAddress]:
+        results = self.multicall(
+            [
+                (
+                    self.factory_contract.address,
+                    HexBytes(
+                        self.factory_contract.functions.getTokenWithId(
+                            i
+                        )._encode_transaction_data()
+                    ),
+                )
+                for i in token_ids
+            ],
+            ["address"],
+        )
+        return [address for (address,) in results]
+
+    def _get_tokens(self, addresses: Sequence[ChecksumAddress]) -> List[ERC20Token]:
+        """
+        Like :meth:`get_token`, but fetches the metadata of all tokens in a single multicall.
+
+        Falls back to :meth:`get_token` for tokens that don't return the standard ERC20 types,
+        and skips tokens it can't handle either.
+        """
+        calls = []
+        for address in addresses:
+            erc20 = _load_contract_erc20(self.w3, address)
+            for function in (
+                erc20.functions.name(),
+                erc20.functions.symbol(),
+                erc20.functions.decimals(),
+            ):
+                calls.append((address, HexBytes(function._encode_transaction_data())))
+        # tryAggregate, so that a single non-compliant token doesn't fail the whole batch
+        results = self._multicall_try_raw(calls)
+
         tokens = []
-        for i in range(tokenCount):
-            address = self.factory_contract.functions.getTokenWithId(i).call()
-            if address == "0x0000000000000000000000000000000000000000":
-                # Token is ETH
-                continue
-            token = self.get_token(address)
-            tokens.append(token)
+        for i, address in enumerate(addresses):
+            (ok0, _name), (ok1, _symbol), (ok2, _decimals) = results[3 * i : 3 * i + 3]
+            if ok0 and ok1 and ok2:
+                try:
+                    (name,) = self.w3.codec.decode(["string"], _name)
+                    (symbol,) = self.w3.codec.decode(["string"], _symbol)
+                    (decimals,) = self.w3.codec.decode(["uint8"], _decimals)
+                except Exception:
+                    pass
+                else:
+                    token = ERC20Token(symbol, address, name, decimals)
+                    self._token_cache[(_str_to_addr(address), "erc20")] = token
+                    tokens.append(token)
+                    continue
+            # Let get_token sort it out
+            try:
+                tokens.append(self.get_token(address))
+            except InvalidToken:
+                logger.warning(f"Skipping invalid token {address}")
         return tokens
@@ -12,6 +12,8 @@ from typing import (
 )
 
 import lru
+from eth_typing.evm import ChecksumAddress
+from eth_utils import is_hex_address
 from web3 import Web3
 from web3.contract import Contract
 from web3.exceptions import NameNotFound
@@ -26,6 +28,8 @@ from .constants import (
 )
 from .types import Address, AddressLike
 
+_ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+
 
 def _get_eth_simple_cache_middleware() -> Middleware:
     return construct_simple_cache_middleware(
@@ -48,33 +52,51 @@ def _str_to_addr(s: Union[AddressLike, str]) -> Address:
 def _addr_to_str(a: AddressLike) -> str:
     if isinstance(a, bytes):
         # Address or ChecksumAddress
-        addr: str = Web3.to_checksum_address("0x" + bytes(a).hex())
+        addr: str = _to_checksum_address("0x" + bytes(a).hex())
         return addr
     elif isinstance(a, str) and a.startswith("0x"):
-        addr = Web3.to_checksum_address(a)
+        addr = _to_checksum_address(a)
         return addr
 
     raise NameNotFound(a)
 
 
+@functools.lru_cache(maxsize=4096)
+def _to_checksum_address(a: Union[AddressLike, str]) -> ChecksumAddress:
+    # Memoized, as the EIP-55 checksum is computed from a keccak hash of the address
+    return Web3.to_checksum_address(a)
+
+
 def is_same_address(a1: Union[AddressLike, str], a2: Union[AddressLike, str]) -> bool:
     return _str_to_addr(a1) == _str_to_addr(a2)
 
 
 def _validate_address(a: AddressLike) -> None:
-    assert _addr_to_str(a)
+    # Shape check only, no checksum (and unlike an assert, not stripped by `python -O`)
+    if isinstance(a, bytes) and len(a) == 20:
+        return
+    if isinstance(a, str) and a.startswith("0x") and is_hex_address(a):
+        return
+    raise NameNotFound(a)
 
 
+@functools.lru_cache(maxsize=None)
 def _load_abi(name: str) -> str:
-    path = f"{os.path.dirname(os.path.abspath(__file__))}/assets/"
-    with open(os.path.abspath(path + f"{name}.abi")) as f:
+    with open(os.path.join(_ASSETS_DIR, f"{name}.abi")) as f:
         abi: str = json.load(f)
     return abi
 
 
-@functools.lru_cache()
 def _load_contract(w3: Web3, abi_name: str, address: AddressLike) -> Contract:
-    address = Web3.to_checksum_address(address)
+    # Normalize the address before hitting the cache, so that the same contract
+    # given as bytes, lowercase or checksummed hex is only constructed once
+    return _load_contract_checksummed(w3, abi_name, _to_checksum_address(address))
+
+
+@functools.lru_cache()
+def _load_contract_checksummed(
+    w3: Web3, abi_name: str, address: ChecksumAddress
+) -> Contract:
     return w3.eth.contract(address=address, abi=_load_abi(abi_name))
 
 
@@ -172,6 +194,42 @@ def chunks(arr: Sequence[Any], n: int) -> Generator:
         yield arr[i : i + n]
 
 
+def _get_amount_out(amount_in: int, reserve_in: int, reserve_out: int) -> int:
+    """
+    Amount received for selling `amount_in` to a v1 exchange with the given reserves (after the 0.3% fee).
+
+    Same integer math as the exchange's ``getInputPrice``.
+    """
+    numerator = amount_in * reserve_out * 997
+    denominator = reserve_in * 1000 + amount_in * 997
+    return numerator // denominator
+
+
+def _get_amount_in(amount_out: int, reserve_in: int, reserve_out: int) -> int:
+    """
+    Amount needed to buy `amount_out` from a v1 exchange with the given reserves (after the 0.3% fee).
+
+    Same integer math as the exchange's ``getOutputPrice``.
+    """
+    numerator = amount_out * reserve_in * 1000
+    denominator = (reserve_out - amount_out) * 997
+    return numerator // denominator + 1
+
+
+def _add_slippage(amount: int, slippage: float) -> int:
+    """
+    Max. amount to spend given a quoted `amount` and `slippage` (0.01 is 1%).
+
+    Computed in integer ppm, as a float can't represent large token amounts exactly.
+    """
+    return amount * (1_000_000 + round(slippage * 1_000_000)) // 1_000_000
+
+
+def _sub_slippage(amount: int, slippage: float) -> int:
+    """Min. amount to receive given a quoted `amount` and `slippage` (0.01 is 1%), see :func:`_add_slippage`."""
+    return amount * (1_000_000 - round(slippage * 1_000_000)) // 1_000_000
+
+
 def fee_to_fraction(fee: int) -> float:
     return fee / 1000000
 